@@ -1,18 +1,94 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
 import shutil
+from dataclasses import asdict
 from pathlib import Path
 
 from . import db as db_mod
-from .categorizer import categorize, config_uses_text
-from .llm import LLMError, llm_classify_category
+from .categorizer import categorize, config_uses_text, prepare_config
+from .llm import (
+    PROMPT_VERSION,
+    LLMClassification,
+    LLMError,
+    LLMTransientError,
+    allm_classify_category,
+)
 from .library import Library
-from .metadata import mdls_basic, mdls_text_sample
+from .metadata import mdls_basic_bulk, mdls_text_sample
 from .organize import build_categorized_view
 from .util import now_ts
 
+# Rows buffered per executemany() call when writing categorization results.
+_WRITE_BATCH_SIZE = 500
+
+# Columns the per-doc loop reads for docs being (re)categorized.
+_WORK_COLUMNS = "hash, vault_relpath, last_seen_at, " + ", ".join(db_mod.METADATA_COLUMNS)
+
+_META_JSON_IDX = db_mod.METADATA_COLUMNS.index("meta_json")
+_META_HASH_IDX = db_mod.METADATA_COLUMNS.index("meta_hash")
+
+# Columns the categorized view needs (for docs not touched by this run).
+_VIEW_COLUMNS = "hash, vault_relpath, title, category, last_seen_at"
+
+# Files per `mdls` invocation when fetching basic metadata.
+_MDLS_CHUNK_SIZE = 100
+
+# Default number of documents in flight (mdls subprocesses + LLM requests).
+# UZU is a local server, so keep this small unless the machine has headroom.
+_DEFAULT_MAX_CONCURRENCY = 4
+
+# Retries (with exponential backoff) for failed LLM requests.
+_LLM_RETRIES = 3
+_LLM_RETRY_BASE_DELAY = 0.5
+
+
+def _resolve_max_concurrency(value: int | None) -> int:
+    """
+    Explicit value wins; otherwise PDF_LIB_MAX_CONCURRENCY, then the default.
+    """
+    if value is None:
+        try:
+            value = int(os.environ.get("PDF_LIB_MAX_CONCURRENCY", _DEFAULT_MAX_CONCURRENCY))
+        except ValueError:
+            value = _DEFAULT_MAX_CONCURRENCY
+    return max(1, int(value))
+
+
+async def _llm_classify_with_retry(sem: asyncio.Semaphore, **kwargs) -> LLMClassification:
+    delay = _LLM_RETRY_BASE_DELAY
+    for attempt in range(_LLM_RETRIES + 1):
+        try:
+            async with sem:
+                return await allm_classify_category(**kwargs)
+        except LLMTransientError:
+            if attempt >= _LLM_RETRIES:
+                raise
+        await asyncio.sleep(delay)
+        delay *= 2
+    raise AssertionError("unreachable")
+
+
+def _meta_fingerprint(md: dict) -> str:
+    """
+    Stable, cheap fingerprint of mdls metadata (keys are unique, so values are never compared).
+    """
+    return hashlib.blake2b(repr(sorted(md.items())).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _llm_cache_key(llm_kwargs: dict) -> str:
+    """
+    Content hash of everything that shapes the LLM request (timeouts excluded), plus the
+    prompt template version.
+    """
+    fields = {k: v for k, v in llm_kwargs.items() if k != "timeout_seconds"}
+    fields["prompt_version"] = PROMPT_VERSION
+    blob = json.dumps(fields, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
 
 def _latest_source_maps(conn) -> tuple[dict[str, str], dict[str, str]]:
     """
@@ -22,24 +98,28 @@ def _latest_source_maps(conn) -> tuple[dict[str, str], dict[str, str]]:
     """
     latest_path: dict[str, str] = {}
     latest_base: dict[str, str] = {}
+    # Dedup inside SQLite so only one row per hash crosses into Python.
     rows = conn.execute(
         """
         SELECT hash, source_path, source_basename
-        FROM source_files
-        WHERE hash IS NOT NULL AND status = 'ok'
-        ORDER BY last_seen_at DESC
+        FROM (
+            SELECT
+                hash, source_path, source_basename,
+                ROW_NUMBER() OVER (PARTITION BY hash ORDER BY last_seen_at DESC) AS rn
+            FROM source_files
+            WHERE hash IS NOT NULL AND status = 'ok'
+        )
+        WHERE rn = 1
         """
-    ).fetchall()
+    )
     for r in rows:
         h = r["hash"]
-        if h not in latest_path:
-            latest_path[h] = r["source_path"]
-        if h not in latest_base:
-            latest_base[h] = r["source_basename"] or Path(r["source_path"]).name
+        latest_path[h] = r["source_path"]
+        latest_base[h] = r["source_basename"] or Path(r["source_path"]).name
     return latest_path, latest_base
 
 
-def categorize_library(
+async def acategorize_library(
     *,
     library: Library,
     config_path: Path | None,
@@ -55,12 +135,18 @@ def categorize_library(
     llm_max_output_tokens: int = 200,
     llm_path_mode: str = "tail",
     llm_path_tail_parts: int = 3,
+    llm_max_concurrency: int | None = None,
+    llm_cache: bool = True,
     verbose: bool = False,
 ) -> dict[str, int]:
+    """
+    Async `categorize_library` (same arguments and result), for callers that already run an
+    event loop.
+    """
     library.ensure_initialized()
 
     cfg = library.load_categories_config(config_path)
-    default_category = cfg.get("default_category", "Unsorted")
+    default_category = str(cfg.get("default_category", "Unsorted"))
     min_score = float(cfg.get("min_score", 4))
 
     # Categories list (for LLM selection + validation).
@@ -71,6 +157,7 @@ def categorize_library(
             categories.append(name)
 
     use_text_rules = config_uses_text(cfg)
+    rules = prepare_config(cfg)
 
     llm_provider = (llm_provider or "off").lower().strip()
     llm_mode = (llm_mode or "fallback").lower().strip()
@@ -87,8 +174,17 @@ def categorize_library(
         # The model is selected when you start the uzu server; this is mostly informative.
         llm_model = llm_model or os.environ.get("UZU_MODEL") or "qwen3-4b"
 
+    # Normalize once; these are constant for the whole run.
+    llm_model = str(llm_model)
+    llm_min_confidence = float(llm_min_confidence)
+    llm_timeout_seconds = float(llm_timeout_seconds)
+    llm_max_output_tokens = int(llm_max_output_tokens)
+    llm_path_tail_parts = int(llm_path_tail_parts)
+
+    mdls_available = shutil.which("mdls") is not None
     use_text_llm = llm_provider != "off"
-    use_text = (use_text_rules or use_text_llm) and text_sample_bytes > 0 and shutil.which("mdls") is not None
+    use_text = (use_text_rules or use_text_llm) and text_sample_bytes > 0 and mdls_available
+    max_concurrency = _resolve_max_concurrency(llm_max_concurrency)
 
     conn = db_mod.connect(library.db_path)
     try:
@@ -97,23 +193,62 @@ def categorize_library(
         latest_source_path_by_hash, latest_source_basename_by_hash = _latest_source_maps(conn)
 
         where = "" if recategorize_all else "(category IS NULL OR category = '')"
-        docs_to_cat = db_mod.iter_documents(conn, where_sql=where)
+        # Parallel lists (one entry per doc) instead of a dict per row; the loop passes indices.
+        hashes: list[str] = []
+        vault_relpaths: list[str] = []
+        last_seen: list[float] = []
+        stored_meta: list[tuple | None] = []
+        for d in db_mod.iter_documents(conn, where_sql=where, columns=_WORK_COLUMNS):
+            hashes.append(d["hash"])
+            vault_relpaths.append(d["vault_relpath"])
+            last_seen.append(d["last_seen_at"])
+            stored_meta.append(tuple(d[c] for c in db_mod.METADATA_COLUMNS))
+
+        # Entries for the categorized view: processed docs are added as they finish, so only
+        # the already-categorized remainder has to be read back from the DB.
+        view_docs: list[dict] = []
+        if not recategorize_all:
+            view_docs.extend(
+                db_mod.iter_documents(
+                    conn,
+                    where_sql="NOT (category IS NULL OR category = '')",
+                    columns=_VIEW_COLUMNS,
+                )
+            )
 
         updated = 0
         llm_calls = 0
         llm_used = 0
         llm_failed = 0
+        llm_cache_hits = 0
         now = now_ts()
 
-        for doc in docs_to_cat:
-            hash_hex = doc["hash"]
-            vault_path = library.root / doc["vault_relpath"]
+        meta_rows: list[tuple] = []
+        cat_rows: list[tuple] = []
+        llm_cache_rows: list[tuple] = []
+
+        def flush_writes() -> None:
+            db_mod.update_documents_metadata_bulk(conn, meta_rows)
+            db_mod.update_documents_category_bulk(conn, cat_rows)
+            db_mod.put_llm_cache_bulk(conn, llm_cache_rows)
+            meta_rows.clear()
+            cat_rows.clear()
+            llm_cache_rows.clear()
+
+        async def process_doc(i: int, md: dict, llm_sem: asyncio.Semaphore) -> None:
+            nonlocal updated, llm_calls, llm_used, llm_failed, llm_cache_hits
+
+            hash_hex = hashes[i]
+            vault_relpath = vault_relpaths[i]
+            vault_path = library.root / vault_relpath
+            stored = stored_meta[i]
+            # Release the stored text/JSON as soon as this doc is picked up.
+            stored_meta[i] = None
+            assert stored is not None
 
             src_path = latest_source_path_by_hash.get(hash_hex)
             src_base = latest_source_basename_by_hash.get(hash_hex) or vault_path.name
 
-            md = mdls_basic(vault_path) if shutil.which("mdls") is not None else {}
-
             page_count = md.get("kMDItemNumberOfPages")
             if isinstance(page_count, float):
                 page_count = int(page_count)
@@ -123,39 +258,51 @@ def categorize_library(
 
             authors_val = md.get("kMDItemAuthors")
             if isinstance(authors_val, list):
-                authors = ", ".join(str(a) for a in authors_val)
+                authors = ", ".join(map(str, authors_val))
             else:
                 authors = str(authors_val) if authors_val else None
 
             keywords_val = md.get("kMDItemKeywords")
             if isinstance(keywords_val, list):
-                keywords = ", ".join(str(k) for k in keywords_val)
+                keywords = ", ".join(map(str, keywords_val))
             else:
                 keywords = str(keywords_val) if keywords_val else None
 
-            text_sample = mdls_text_sample(vault_path, max_bytes=text_sample_bytes) if use_text else None
-
-            meta_json = None
-            if md:
-                try:
-                    meta_json = json.dumps(md, ensure_ascii=False, sort_keys=True)
-                except Exception:
-                    meta_json = None
+            text_sample = (
+                await asyncio.to_thread(mdls_text_sample, vault_path, max_bytes=text_sample_bytes)
+                if use_text
+                else None
+            )
 
-            db_mod.update_document_metadata(
-                conn,
-                hash_hex=hash_hex,
-                page_count=page_count if isinstance(page_count, int) else None,
-                title=title if isinstance(title, str) else None,
-                authors=authors,
-                subject=subject if isinstance(subject, str) else None,
-                keywords=keywords,
-                text_sample=text_sample,
-                meta_json=meta_json,
+            meta_hash = _meta_fingerprint(md) if md else None
+            if meta_hash is not None and meta_hash == stored[_META_HASH_IDX]:
+                # Metadata unchanged since the last run: reuse the stored JSON.
+                meta_json = stored[_META_JSON_IDX]
+            else:
+                meta_json = None
+                if md:
+                    try:
+                        # Serialize off the event loop so it overlaps other docs' mdls calls.
+                        meta_json = await asyncio.to_thread(json.dumps, md, ensure_ascii=False, sort_keys=True)
+                    except Exception:
+                        meta_json = None
+
+            meta_row = (
+                page_count if isinstance(page_count, int) else None,
+                title if isinstance(title, str) else None,
+                authors,
+                subject if isinstance(subject, str) else None,
+                keywords,
+                text_sample,
+                meta_json,
+                meta_hash,
             )
+            # Skip the UPDATE entirely when it would not change the row.
+            if meta_row != stored:
+                meta_rows.append((*meta_row, hash_hex))
 
             cat_rules = categorize(
-                cfg=cfg,
+                cfg=rules,
                 source_path=src_path,
                 source_basename=src_base,
                 title=title if isinstance(title, str) else None,
@@ -181,28 +328,39 @@ def categorize_library(
                     )
 
                 if should_call_llm:
-                    llm_calls += 1
+                    llm_kwargs = dict(
+                        provider=llm_provider,
+                        model=llm_model,
+                        categories=categories,
+                        default_category=default_category,
+                        source_path=src_path,
+                        source_basename=src_base,
+                        title=title if isinstance(title, str) else None,
+                        authors=authors,
+                        subject=subject if isinstance(subject, str) else None,
+                        keywords=keywords,
+                        page_count=page_count if isinstance(page_count, int) else None,
+                        text_sample=text_sample if use_text else None,
+                        timeout_seconds=llm_timeout_seconds,
+                        max_output_tokens=llm_max_output_tokens,
+                        path_mode=llm_path_mode,
+                        path_tail_parts=llm_path_tail_parts,
+                    )
+                    # With the cache off, skip the lookup but still store the fresh answer so it
+                    # replaces any stale one (e.g. after switching the model UZU serves).
+                    cache_key = _llm_cache_key(llm_kwargs)
+                    cached = db_mod.get_llm_cache(conn, cache_key) if llm_cache else None
                     try:
-                        llm_result = llm_classify_category(
-                            provider=llm_provider,  # type: ignore[arg-type]
-                            model=str(llm_model),
-                            categories=categories,
-                            default_category=str(default_category),
-                            source_path=src_path,
-                            source_basename=src_base,
-                            title=title if isinstance(title, str) else None,
-                            authors=authors,
-                            subject=subject if isinstance(subject, str) else None,
-                            keywords=keywords,
-                            page_count=page_count if isinstance(page_count, int) else None,
-                            text_sample=text_sample if use_text else None,
-                            timeout_seconds=float(llm_timeout_seconds),
-                            max_output_tokens=int(llm_max_output_tokens),
-                            path_mode=llm_path_mode,  # type: ignore[arg-type]
-                            path_tail_parts=int(llm_path_tail_parts),
-                        )
-
-                        if llm_result.confidence >= float(llm_min_confidence):
+                        if cached is not None:
+                            llm_cache_hits += 1
+                            llm_result = LLMClassification(**json.loads(cached["response_json"]))
+                        else:
+                            llm_calls += 1
+                            llm_result = await _llm_classify_with_retry(llm_sem, **llm_kwargs)
+                            response_json = json.dumps(asdict(llm_result), ensure_ascii=False)
+                            llm_cache_rows.append((cache_key, llm_model, response_json, now_ts()))
+
+                        if llm_result.confidence >= llm_min_confidence:
                             final_category = llm_result.category
                             final_score = 10.0 * float(llm_result.confidence)
                             final_reason = (
@@ -220,22 +378,53 @@ def categorize_library(
                         llm_failed += 1
                         final_reason = f"{final_reason} | llm_error:{str(e)[:200]}"
 
-            db_mod.update_document_category(
-                conn,
-                hash_hex=hash_hex,
-                category=final_category,
-                score=float(final_score),
-                reason=final_reason,
-                categorized_at=now,
+            cat_rows.append((final_category, float(final_score), final_reason, now, hash_hex))
+            view_docs.append(
+                {
+                    "hash": hash_hex,
+                    "vault_relpath": vault_relpath,
+                    "title": title if isinstance(title, str) else None,
+                    "category": final_category,
+                    "last_seen_at": last_seen[i],
+                }
             )
             updated += 1
+            if len(cat_rows) >= _WRITE_BATCH_SIZE:
+                flush_writes()
 
             if verbose and updated % 250 == 0:
                 print(f"categorized {updated}…")
 
-        # Always rebuild the categorized view from current DB state.
-        all_docs = db_mod.iter_documents(conn)
-        titles = {d["hash"]: (d.get("title") or "") for d in all_docs}
+        async def process_all() -> None:
+            llm_sem = asyncio.Semaphore(max_concurrency)
+            # Sliding window: keep at most `max_concurrency` docs in flight and submit the
+            # next one as each finishes, so huge libraries never materialize every task.
+            pending: set[asyncio.Task] = set()
+            for start in range(0, len(hashes), _MDLS_CHUNK_SIZE):
+                chunk = range(start, min(start + _MDLS_CHUNK_SIZE, len(hashes)))
+                # One mdls subprocess per chunk, run on the thread pool while earlier docs finish.
+                mds: dict[Path, dict] = {}
+                if mdls_available:
+                    paths = [library.root / vault_relpaths[i] for i in chunk]
+                    mds = await asyncio.to_thread(mdls_basic_bulk, paths)
+                for i in chunk:
+                    if len(pending) >= max_concurrency:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            task.result()
+                    md = mds.get(library.root / vault_relpaths[i], {})
+                    pending.add(asyncio.create_task(process_doc(i, md, llm_sem)))
+            if pending:
+                await asyncio.gather(*pending)
+
+        # One transaction for the whole pass; rows are flushed in batches.
+        with db_mod.transaction(conn):
+            await process_all()
+            flush_writes()
+
+        # Always rebuild the categorized view (same order as a full DB read would give).
+        view_docs.sort(key=lambda d: d["last_seen_at"], reverse=True)
+        titles = {d["hash"]: (d.get("title") or "") for d in view_docs}
 
         def name_resolver(h: str) -> str:
             t = titles.get(h) or ""
@@ -249,24 +438,68 @@ def categorize_library(
 
         by_category = build_categorized_view(
             library=library,
-            documents=all_docs,
+            documents=view_docs,
             link_mode=link_mode,
             refresh=refresh_view,
             default_category=default_category,
             name_resolver=name_resolver,
         )
 
-        conn.commit()
-
         return {
             "docs_categorized": updated,
             "links_created": by_category.get("_total_links", 0),
             "llm_calls": llm_calls,
             "llm_used": llm_used,
             "llm_failed": llm_failed,
+            "llm_cache_hits": llm_cache_hits,
             **{f"cat:{k}": v for k, v in by_category.items() if k != "_total_links"},
         }
     finally:
         conn.close()
 
 
+def categorize_library(
+    *,
+    library: Library,
+    config_path: Path | None,
+    link_mode: str,
+    refresh_view: bool,
+    recategorize_all: bool,
+    text_sample_bytes: int,
+    llm_provider: str = "off",
+    llm_model: str | None = None,
+    llm_mode: str = "fallback",
+    llm_min_confidence: float = 0.6,
+    llm_timeout_seconds: float = 30.0,
+    llm_max_output_tokens: int = 200,
+    llm_path_mode: str = "tail",
+    llm_path_tail_parts: int = 3,
+    llm_max_concurrency: int | None = None,
+    llm_cache: bool = True,
+    verbose: bool = False,
+) -> dict[str, int]:
+    """
+    Categorize every vault document and rebuild the categorized view. Inside a running event
+    loop (Jupyter, async apps) await `acategorize_library` instead.
+    """
+    return asyncio.run(
+        acategorize_library(
+            library=library,
+            config_path=config_path,
+            link_mode=link_mode,
+            refresh_view=refresh_view,
+            recategorize_all=recategorize_all,
+            text_sample_bytes=text_sample_bytes,
+            llm_provider=llm_provider,
+            llm_model=llm_model,
+            llm_mode=llm_mode,
+            llm_min_confidence=llm_min_confidence,
+            llm_timeout_seconds=llm_timeout_seconds,
+            llm_max_output_tokens=llm_max_output_tokens,
+            llm_path_mode=llm_path_mode,
+            llm_path_tail_parts=llm_path_tail_parts,
+            llm_max_concurrency=llm_max_concurrency,
+            llm_cache=llm_cache,
+            verbose=verbose,
+        )
+    )
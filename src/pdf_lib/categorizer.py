@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Iterable
 
+try:
+    # Optional C extension (pyahocorasick): one pass per field instead of one `in` per keyword.
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
 
 @dataclass(frozen=True)
 class Categorization:
@@ -11,25 +17,142 @@ class Categorization:
     reason: str
 
 
+@dataclass(frozen=True)
+class PreparedCategory:
+    name: str
+    priority: float
+    min_pages: int | None
+    max_pages: int | None
+    # (lowercased + stripped keyword, keyword as written in the config) pairs, empties dropped.
+    # Matching uses the lowercase form; reasons show the original.
+    path_keywords: tuple[tuple[str, str], ...]
+    filename_keywords: tuple[tuple[str, str], ...]
+    metadata_keywords: tuple[tuple[str, str], ...]
+    text_keywords: tuple[tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class PreparedConfig:
+    default_category: str
+    min_score: float
+    categories: tuple[PreparedCategory, ...]
+    # Per-field Aho-Corasick automatons over all categories' keywords (None without pyahocorasick).
+    path_matcher: Any = field(default=None, compare=False, repr=False)
+    filename_matcher: Any = field(default=None, compare=False, repr=False)
+    metadata_matcher: Any = field(default=None, compare=False, repr=False)
+    text_matcher: Any = field(default=None, compare=False, repr=False)
+
+
 def _lower(s: str | None) -> str:
     return (s or "").lower()
 
 
-def _any_kw(haystack: str, keywords: Iterable[str]) -> list[str]:
-    hs = haystack.lower()
-    hits: list[str] = []
-    for kw in keywords:
-        kw_l = kw.lower().strip()
-        if not kw_l:
+def _lower_keywords(keywords: Iterable[Any] | None) -> tuple[tuple[str, str], ...]:
+    out: list[tuple[str, str]] = []
+    for kw in keywords or ():
+        kw_orig = str(kw)
+        kw_l = kw_orig.lower().strip()
+        if kw_l:
+            out.append((kw_l, kw_orig))
+    return tuple(out)
+
+
+def _build_matcher(keyword_groups: Iterable[tuple[tuple[str, str], ...]]) -> Any:
+    if ahocorasick is None:
+        return None
+    words = {kw for group in keyword_groups for kw, _orig in group}
+    if not words:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in words:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+def prepare_config(cfg: dict[str, Any]) -> PreparedConfig:
+    """
+    Normalize a categories config once so `categorize` does no per-document keyword prep.
+    """
+    cats: list[PreparedCategory] = []
+    for cat in cfg.get("categories", []):
+        name = str(cat.get("name", "")).strip()
+        if not name:
             continue
-        if kw_l in hs:
-            hits.append(kw)
-    return hits
+        min_pages = cat.get("min_pages")
+        max_pages = cat.get("max_pages")
+        path_kw = _lower_keywords(cat.get("path_keywords_any"))
+        file_kw = _lower_keywords(cat.get("filename_keywords_any"))
+        meta_kw = _lower_keywords(cat.get("metadata_keywords_any"))
+        text_kw = _lower_keywords(cat.get("text_keywords_any"))
+        cats.append(
+            PreparedCategory(
+                name=name,
+                priority=float(cat.get("priority", 0)),
+                min_pages=min_pages if isinstance(min_pages, int) else None,
+                max_pages=max_pages if isinstance(max_pages, int) else None,
+                path_keywords=path_kw,
+                filename_keywords=file_kw,
+                metadata_keywords=meta_kw,
+                text_keywords=text_kw,
+            )
+        )
+    return PreparedConfig(
+        default_category=cfg.get("default_category", "Unsorted"),
+        min_score=float(cfg.get("min_score", 4)),
+        categories=tuple(cats),
+        path_matcher=_build_matcher(c.path_keywords for c in cats),
+        filename_matcher=_build_matcher(c.filename_keywords for c in cats),
+        metadata_matcher=_build_matcher(c.metadata_keywords for c in cats),
+        text_matcher=_build_matcher(c.text_keywords for c in cats),
+    )
+
+
+def _count_kw(haystack_lc: str, keywords: Iterable[tuple[str, str]]) -> tuple[int, str | None]:
+    """
+    (number of keywords found, first one found as written in the config). Matching compares the
+    already-lowercased haystack against the lowercased keywords.
+    """
+    count = 0
+    first: str | None = None
+    for kw, orig in keywords:
+        if kw in haystack_lc:
+            if first is None:
+                first = orig
+            count += 1
+    return count, first
+
+
+def _found_keywords(matcher: Any, haystack_lc: str) -> set[str] | None:
+    """
+    All keywords occurring in haystack_lc, in one automaton pass (None if no matcher).
+    """
+    if matcher is None:
+        return None
+    return {kw for _end, kw in matcher.iter(haystack_lc)}
+
+
+def _field_count(
+    found: set[str] | None,
+    haystack_lc: str,
+    keywords: tuple[tuple[str, str], ...],
+) -> tuple[int, str | None]:
+    if found is None:
+        return _count_kw(haystack_lc, keywords)
+    # Walk keywords in config order so the first hit (used in reasons) matches the plain scan.
+    count = 0
+    first: str | None = None
+    for kw, orig in keywords:
+        if kw in found:
+            if first is None:
+                first = orig
+            count += 1
+    return count, first
 
 
 def categorize(
     *,
-    cfg: dict[str, Any],
+    cfg: PreparedConfig | dict[str, Any],
     source_path: str | None,
     source_basename: str | None,
     title: str | None,
@@ -39,58 +162,57 @@ def categorize(
     text_sample: str | None,
     page_count: int | None,
 ) -> Categorization:
-    default_category = cfg.get("default_category", "Unsorted")
-    min_score = float(cfg.get("min_score", 4))
+    prepared = cfg if isinstance(cfg, PreparedConfig) else prepare_config(cfg)
+    default_category = prepared.default_category
+    min_score = prepared.min_score
 
     path_l = _lower(source_path)
     base_l = _lower(source_basename)
     meta_l = " ".join([_lower(title), _lower(subject), _lower(keywords), _lower(authors)])
     text_l = _lower(text_sample)
 
-    best = Categorization(category=default_category, score=0.0, reason="no rules matched")
+    path_found = _found_keywords(prepared.path_matcher, path_l)
+    file_found = _found_keywords(prepared.filename_matcher, base_l)
+    meta_found = _found_keywords(prepared.metadata_matcher, meta_l)
+    text_found = _found_keywords(prepared.text_matcher, text_l)
 
-    for cat in cfg.get("categories", []):
-        name = str(cat.get("name", "")).strip()
-        if not name:
-            continue
+    best = Categorization(category=default_category, score=0.0, reason="no rules matched")
 
-        min_pages = cat.get("min_pages")
-        max_pages = cat.get("max_pages")
+    for cat in prepared.categories:
         if page_count is not None:
-            if isinstance(min_pages, int) and page_count < min_pages:
+            if cat.min_pages is not None and page_count < cat.min_pages:
                 continue
-            if isinstance(max_pages, int) and page_count > max_pages:
+            if cat.max_pages is not None and page_count > cat.max_pages:
                 continue
 
         score = 0.0
         reasons: list[str] = []
 
-        path_hits = _any_kw(path_l, cat.get("path_keywords_any", []))
-        if path_hits:
-            score += 2.0 + 0.25 * (len(path_hits) - 1)
-            reasons.append(f"path:{path_hits[0]}")
+        n, first = _field_count(path_found, path_l, cat.path_keywords)
+        if n:
+            score += 2.0 + 0.25 * (n - 1)
+            reasons.append(f"path:{first}")
 
-        file_hits = _any_kw(base_l, cat.get("filename_keywords_any", []))
-        if file_hits:
-            score += 2.0 + 0.25 * (len(file_hits) - 1)
-            reasons.append(f"filename:{file_hits[0]}")
+        n, first = _field_count(file_found, base_l, cat.filename_keywords)
+        if n:
+            score += 2.0 + 0.25 * (n - 1)
+            reasons.append(f"filename:{first}")
 
-        meta_hits = _any_kw(meta_l, cat.get("metadata_keywords_any", []))
-        if meta_hits:
-            score += 3.0 + 0.25 * (len(meta_hits) - 1)
-            reasons.append(f"meta:{meta_hits[0]}")
+        n, first = _field_count(meta_found, meta_l, cat.metadata_keywords)
+        if n:
+            score += 3.0 + 0.25 * (n - 1)
+            reasons.append(f"meta:{first}")
 
-        text_hits = _any_kw(text_l, cat.get("text_keywords_any", []))
-        if text_hits:
-            score += 4.0 + 0.25 * (len(text_hits) - 1)
-            reasons.append(f"text:{text_hits[0]}")
+        n, first = _field_count(text_found, text_l, cat.text_keywords)
+        if n:
+            score += 4.0 + 0.25 * (n - 1)
+            reasons.append(f"text:{first}")
 
         # Tie-breaker / preference
-        priority = cat.get("priority", 0)
-        score += float(priority) * 1e-6
+        score += cat.priority * 1e-6
 
         if score > best.score:
-            best = Categorization(category=name, score=score, reason=", ".join(reasons) or "matched category")
+            best = Categorization(category=cat.name, score=score, reason=", ".join(reasons) or "matched category")
 
     if best.score < min_score:
         return Categorization(category=default_category, score=best.score, reason="below min_score; defaulted")
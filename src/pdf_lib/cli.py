@@ -68,6 +68,8 @@ def cmd_categorize(args: argparse.Namespace) -> int:
         llm_max_output_tokens=args.llm_max_output_tokens,
         llm_path_mode=args.llm_path_mode,
         llm_path_tail_parts=args.llm_path_tail_parts,
+        llm_max_concurrency=args.llm_max_concurrency,
+        llm_cache=not args.llm_no_cache,
         verbose=args.verbose,
     )
     print(json.dumps(stats, indent=2, sort_keys=True))
@@ -105,6 +107,8 @@ def cmd_run(args: argparse.Namespace) -> int:
         llm_max_output_tokens=args.llm_max_output_tokens,
         llm_path_mode=args.llm_path_mode,
         llm_path_tail_parts=args.llm_path_tail_parts,
+        llm_max_concurrency=args.llm_max_concurrency,
+        llm_cache=not args.llm_no_cache,
         verbose=args.verbose,
     )
     out = {"scan": scan_stats, "categorize": cat_stats}
@@ -209,6 +213,16 @@ def build_parser() -> argparse.ArgumentParser:
             default=3,
             help="If --llm-path-mode=tail, number of trailing path components to include",
         )
+        sp.add_argument(
+            "--llm-max-concurrency",
+            type=int,
+            help="Documents processed concurrently (mdls + LLM calls; default: $PDF_LIB_MAX_CONCURRENCY or 4)",
+        )
+        sp.add_argument(
+            "--llm-no-cache",
+            action="store_true",
+            help="Always call the LLM, ignoring cached answers; fresh answers replace the cached ones",
+        )
 
     p_cat = sub.add_parser(
         "categorize",
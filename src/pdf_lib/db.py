@@ -1,21 +1,53 @@
 from __future__ import annotations
 
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
 
 def connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(str(db_path))
+    # Autocommit mode: callers group writes explicitly with `transaction()`.
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Hold one write transaction (BEGIN IMMEDIATE ... COMMIT) for the enclosed block.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        # A failed checkpoint() can leave no transaction open; don't mask its error.
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def checkpoint(conn: sqlite3.Connection) -> None:
+    """
+    Commit the work so far inside a `transaction()` block and open the next transaction.
+    """
+    conn.execute("COMMIT")
+    conn.execute("BEGIN IMMEDIATE")
+
+
 def init_schema(conn: sqlite3.Connection) -> None:
     conn.executescript(
         """
         PRAGMA foreign_keys = ON;
         PRAGMA journal_mode = WAL;
+        -- Per-connection throughput settings. NORMAL is still crash-safe under WAL.
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+        PRAGMA wal_autocheckpoint = 1000;
 
         CREATE TABLE IF NOT EXISTS documents (
             hash TEXT PRIMARY KEY,
@@ -32,6 +64,7 @@ def init_schema(conn: sqlite3.Connection) -> None:
             keywords TEXT,
             text_sample TEXT,
             meta_json TEXT,
+            meta_hash TEXT,
 
             category TEXT,
             category_score REAL,
@@ -44,6 +77,8 @@ def init_schema(conn: sqlite3.Connection) -> None:
             source_basename TEXT,
             source_size INTEGER,
             source_mtime REAL,
+            source_dev INTEGER,
+            source_ino INTEGER,
             hash TEXT,
 
             first_seen_at REAL NOT NULL,
@@ -55,10 +90,29 @@ def init_schema(conn: sqlite3.Connection) -> None:
             FOREIGN KEY(hash) REFERENCES documents(hash)
         );
 
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            prompt_hash TEXT PRIMARY KEY,
+            model TEXT,
+            response_json TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+
         CREATE INDEX IF NOT EXISTS idx_source_hash ON source_files(hash);
+        CREATE INDEX IF NOT EXISTS idx_source_hash_seen ON source_files(hash, last_seen_at DESC);
         CREATE INDEX IF NOT EXISTS idx_documents_category ON documents(category);
+        CREATE INDEX IF NOT EXISTS idx_source_size_mtime ON source_files(source_size, source_mtime);
         """
     )
+    # Columns added after the initial schema (existing manifests are migrated in place).
+    _ensure_column(conn, "documents", "meta_hash", "TEXT")
+    _ensure_column(conn, "source_files", "source_dev", "INTEGER")
+    _ensure_column(conn, "source_files", "source_ino", "INTEGER")
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
 
 
 def row_to_dict(row: sqlite3.Row | None) -> dict[str, Any] | None:
@@ -75,13 +129,46 @@ def get_source(conn: sqlite3.Connection, source_path: str) -> dict[str, Any] | N
     return row_to_dict(row)
 
 
-def touch_source_seen(conn: sqlite3.Connection, source_path: str, *, seen_at: float) -> None:
+def touch_source_seen(
+    conn: sqlite3.Connection,
+    source_path: str,
+    *,
+    seen_at: float,
+    source_dev: int | None = None,
+    source_ino: int | None = None,
+) -> None:
+    # dev/ino are backfilled for rows recorded before those columns existed.
     conn.execute(
-        "UPDATE source_files SET last_seen_at = ? WHERE source_path = ?",
-        (seen_at, source_path),
+        """
+        UPDATE source_files SET
+            last_seen_at = ?,
+            source_dev = COALESCE(?, source_dev),
+            source_ino = COALESCE(?, source_ino)
+        WHERE source_path = ?
+        """,
+        (seen_at, source_dev, source_ino, source_path),
     )
 
 
+def find_hash_by_file_identity(
+    conn: sqlite3.Connection, *, source_size: int, source_mtime: float, source_dev: int, source_ino: int
+) -> str | None:
+    """
+    Hash of an already-ingested source with the same size, mtime, device and inode
+    (a moved/renamed or hard-linked file), or None.
+    """
+    row = conn.execute(
+        """
+        SELECT hash FROM source_files
+        WHERE source_size = ? AND source_mtime = ? AND source_dev = ? AND source_ino = ?
+          AND status = 'ok' AND hash IS NOT NULL
+        LIMIT 1
+        """,
+        (source_size, source_mtime, source_dev, source_ino),
+    ).fetchone()
+    return row[0] if row else None
+
+
 def upsert_source(
     conn: sqlite3.Connection,
     *,
@@ -94,18 +181,22 @@ def upsert_source(
     error: str | None,
     first_seen_at: float,
     last_seen_at: float,
+    source_dev: int | None = None,
+    source_ino: int | None = None,
 ) -> None:
     conn.execute(
         """
         INSERT INTO source_files (
-            source_path, source_basename, source_size, source_mtime, hash,
+            source_path, source_basename, source_size, source_mtime, source_dev, source_ino, hash,
             first_seen_at, last_seen_at, status, error
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(source_path) DO UPDATE SET
             source_basename = excluded.source_basename,
             source_size = excluded.source_size,
             source_mtime = excluded.source_mtime,
+            source_dev = excluded.source_dev,
+            source_ino = excluded.source_ino,
             hash = excluded.hash,
             last_seen_at = excluded.last_seen_at,
             status = excluded.status,
@@ -116,6 +207,8 @@ def upsert_source(
             source_basename,
             source_size,
             source_mtime,
+            source_dev,
+            source_ino,
             hash_hex,
             first_seen_at,
             last_seen_at,
@@ -152,6 +245,39 @@ def upsert_document_seen(
     )
 
 
+# Column order of the metadata rows passed to update_documents_metadata_bulk (before hash).
+METADATA_COLUMNS = (
+    "page_count",
+    "title",
+    "authors",
+    "subject",
+    "keywords",
+    "text_sample",
+    "meta_json",
+    "meta_hash",
+)
+
+_UPDATE_METADATA_SQL = """
+    UPDATE documents
+    SET
+        page_count = ?,
+        title = ?,
+        authors = ?,
+        subject = ?,
+        keywords = ?,
+        text_sample = ?,
+        meta_json = ?,
+        meta_hash = ?
+    WHERE hash = ?
+"""
+
+_UPDATE_CATEGORY_SQL = """
+    UPDATE documents
+    SET category = ?, category_score = ?, category_reason = ?, categorized_at = ?
+    WHERE hash = ?
+"""
+
+
 def update_document_metadata(
     conn: sqlite3.Connection,
     *,
@@ -163,21 +289,11 @@ def update_document_metadata(
     keywords: str | None,
     text_sample: str | None,
     meta_json: str | None,
+    meta_hash: str | None = None,
 ) -> None:
     conn.execute(
-        """
-        UPDATE documents
-        SET
-            page_count = ?,
-            title = ?,
-            authors = ?,
-            subject = ?,
-            keywords = ?,
-            text_sample = ?,
-            meta_json = ?
-        WHERE hash = ?
-        """,
-        (page_count, title, authors, subject, keywords, text_sample, meta_json, hash_hex),
+        _UPDATE_METADATA_SQL,
+        (page_count, title, authors, subject, keywords, text_sample, meta_json, meta_hash, hash_hex),
     )
 
 
@@ -191,27 +307,41 @@ def update_document_category(
     categorized_at: float,
 ) -> None:
     conn.execute(
-        """
-        UPDATE documents
-        SET category = ?, category_score = ?, category_reason = ?, categorized_at = ?
-        WHERE hash = ?
-        """,
+        _UPDATE_CATEGORY_SQL,
         (category, score, reason, categorized_at, hash_hex),
     )
 
 
+def update_documents_metadata_bulk(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+    """
+    rows: (*METADATA_COLUMNS, hash)
+    """
+    conn.executemany(_UPDATE_METADATA_SQL, rows)
+
+
+def update_documents_category_bulk(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+    """
+    rows: (category, score, reason, categorized_at, hash)
+    """
+    conn.executemany(_UPDATE_CATEGORY_SQL, rows)
+
+
 def iter_documents(
     conn: sqlite3.Connection,
     *,
     where_sql: str = "",
     params: Iterable[Any] = (),
-) -> list[dict[str, Any]]:
-    sql = "SELECT * FROM documents"
+    columns: str = "*",
+) -> Iterator[dict[str, Any]]:
+    """
+    Stream documents as dicts; wrap in list() if you need to iterate more than once.
+    """
+    sql = f"SELECT {columns} FROM documents"
     if where_sql.strip():
         sql += " WHERE " + where_sql
     sql += " ORDER BY last_seen_at DESC"
-    rows = conn.execute(sql, tuple(params)).fetchall()
-    return [dict(r) for r in rows]
+    for r in conn.execute(sql, tuple(params)):
+        yield dict(r)
 
 
 def get_latest_source_for_hash(conn: sqlite3.Connection, hash_hex: str) -> dict[str, Any] | None:
@@ -227,3 +357,23 @@ def get_latest_source_for_hash(conn: sqlite3.Connection, hash_hex: str) -> dict[
     return row_to_dict(row)
 
 
+def get_llm_cache(conn: sqlite3.Connection, prompt_hash: str) -> dict[str, Any] | None:
+    row = conn.execute("SELECT * FROM llm_cache WHERE prompt_hash = ?", (prompt_hash,)).fetchone()
+    return row_to_dict(row)
+
+
+def put_llm_cache_bulk(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+    """
+    rows: (prompt_hash, model, response_json, created_at)
+    """
+    conn.executemany(
+        """
+        INSERT INTO llm_cache (prompt_hash, model, response_json, created_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(prompt_hash) DO UPDATE SET
+            model = excluded.model,
+            response_json = excluded.response_json,
+            created_at = excluded.created_at
+        """,
+        rows,
+    )
@@ -7,6 +7,12 @@ from pathlib import Path
 from . import db as db_mod
 from .util import ensure_dir
 
+try:
+    # Optional C JSON parser; stdlib json is used when it isn't installed.
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 
 def default_library_path() -> Path:
     return Path.home() / "PDF_Library"
@@ -63,6 +69,10 @@ class Library:
 
     def load_categories_config(self, path: Path | None = None) -> dict:
         cfg_path = path or self.categories_config_path
-        return json.loads(cfg_path.read_text(encoding="utf-8"))
+        # Parse bytes directly (both parsers accept UTF-8 bytes); skips an intermediate str.
+        data = cfg_path.read_bytes()
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
 
 
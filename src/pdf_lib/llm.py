@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import http.client
 import json
 import os
 import re
+import socket
+import threading
 import time
-import urllib.error
-import urllib.request
+import urllib.parse
 from ast import literal_eval
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Iterable, Literal
 
 
 ProviderName = Literal["uzu"]
@@ -28,6 +32,62 @@ class LLMError(RuntimeError):
     pass
 
 
+class LLMTransientError(LLMError):
+    """
+    A failure worth retrying: dropped connection, timeout or HTTP 5xx.
+    """
+
+
+# Keep-alive connections to the (local) LLM server, reused across calls and threads.
+_POOL_MAXSIZE = 16
+_pool_lock = threading.Lock()
+_pool: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+
+
+@lru_cache(maxsize=32)
+def _split_url(url: str) -> tuple[tuple[str, str, int], str]:
+    """
+    Returns ((scheme, host, port), path-with-query); parsed once per distinct URL.
+    """
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in {"http", "https"} or not parts.hostname:
+        raise LLMError(f"Unsupported URL: {url}")
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return (scheme, parts.hostname, port), path
+
+
+def _acquire_connection(
+    key: tuple[str, str, int], timeout_seconds: float
+) -> tuple[http.client.HTTPConnection, bool]:
+    """
+    Returns (connection, reused).
+    """
+    with _pool_lock:
+        conns = _pool.get(key)
+        conn = conns.pop() if conns else None
+    if conn is not None:
+        conn.timeout = timeout_seconds
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout_seconds)
+        return conn, True
+    scheme, host, port = key
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    return cls(host, port, timeout=timeout_seconds), False
+
+
+def _release_connection(key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+    with _pool_lock:
+        conns = _pool.setdefault(key, [])
+        if len(conns) < _POOL_MAXSIZE:
+            conns.append(conn)
+            return
+    conn.close()
+
+
 def _http_post_json(
     *,
     url: str,
@@ -36,15 +96,34 @@ def _http_post_json(
     timeout_seconds: float,
 ) -> dict[str, Any]:
     data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-    try:
-        with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
+    key, path = _split_url(url)
+
+    while True:
+        conn, reused = _acquire_connection(key, timeout_seconds)
+        try:
+            conn.request("POST", path, body=data, headers=headers)
+            resp = conn.getresponse()
             body = resp.read()
-    except urllib.error.HTTPError as e:
-        body = e.read()
-        raise LLMError(f"HTTP {e.code} from {url}: {body[:800]!r}") from e
-    except urllib.error.URLError as e:
-        raise LLMError(f"Network error calling {url}: {e}") from e
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            if reused and isinstance(e, (ConnectionError, http.client.BadStatusLine)):
+                # The server dropped an idle keep-alive connection; retry on a fresh one.
+                continue
+            # Nothing listening / unknown host will not fix itself; resets and timeouts may.
+            if isinstance(e, (ConnectionRefusedError, socket.gaierror)):
+                raise LLMError(f"Network error calling {url}: {e}") from e
+            raise LLMTransientError(f"Network error calling {url}: {e}") from e
+        break
+
+    if resp.will_close:
+        conn.close()
+    else:
+        _release_connection(key, conn)
+
+    if resp.status >= 500:
+        raise LLMTransientError(f"HTTP {resp.status} from {url}: {body[:800]!r}")
+    if resp.status >= 400:
+        raise LLMError(f"HTTP {resp.status} from {url}: {body[:800]!r}")
 
     try:
         return json.loads(body.decode("utf-8", errors="replace"))
@@ -53,6 +132,13 @@ def _http_post_json(
 
 
 _CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE | re.MULTILINE)
+_CAT_RE = re.compile(r"category\s*[:=]\s*['\"]([^'\"]+)['\"]", re.IGNORECASE)
+_CONF_RE = re.compile(r"confidence\s*[:=]\s*([0-9]*\.?[0-9]+)", re.IGNORECASE)
+_REASON_RE = re.compile(r"reason\s*[:=]\s*['\"]([^'\"]+)['\"]", re.IGNORECASE)
+_NORM_PUNCT_RE = re.compile(r"[^a-z0-9]+")
+_WS_RE = re.compile(r"\s+")
+# Smart quotes that frequently appear in model outputs.
+_SMART_QUOTES = str.maketrans({"\u201c": '"', "\u201d": '"', "\u2018": "'", "\u2019": "'"})
 
 
 def _extract_json_object(text: str) -> dict[str, Any]:
@@ -63,15 +149,17 @@ def _extract_json_object(text: str) -> dict[str, Any]:
     if not t:
         raise LLMError("Empty model output")
 
+    # Fast path: well-behaved output is already a bare JSON object.
+    try:
+        obj = json.loads(t)
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+
     # Remove common markdown fences
     t2 = _CODE_FENCE_RE.sub("", t).strip()
-    # Normalize smart quotes that frequently appear in model outputs.
-    t2 = (
-        t2.replace("\u201c", '"')
-        .replace("\u201d", '"')
-        .replace("\u2018", "'")
-        .replace("\u2019", "'")
-    )
+    t2 = t2.translate(_SMART_QUOTES)
 
     # If it is already a JSON object, parse directly.
     if t2.startswith("{") and t2.endswith("}"):
@@ -86,19 +174,18 @@ def _extract_json_object(text: str) -> dict[str, Any]:
     # and pick the "best" one (prefer objects that contain a string "category").
     decoder = json.JSONDecoder()
     candidates: list[dict[str, Any]] = []
-    for i, ch in enumerate(t2):
-        if ch != "{":
-            continue
+    i = t2.find("{")
+    while i != -1:
         try:
-            obj, _end = decoder.raw_decode(t2[i:])
+            obj, _end = decoder.raw_decode(t2, i)
         except Exception:
-            continue
+            obj = None
+        i = t2.find("{", i + 1)
         if isinstance(obj, dict):
+            if isinstance(obj.get("category"), str):
+                return obj
             candidates.append(obj)
 
-    for obj in candidates:
-        if isinstance(obj.get("category"), str):
-            return obj
     if candidates:
         return candidates[0]
 
@@ -109,23 +196,17 @@ def _extract_json_object(text: str) -> dict[str, Any]:
         # Last-ditch: try regex extraction even if braces are missing.
         return _extract_object_by_regex(t2)
 
-    candidate = t2[start : end + 1]
+    # No JSON object decodes from any '{' (the scan above already tried `start`),
+    # but many local models output "Python dicts" with single quotes.
     try:
-        obj = json.loads(candidate)
-        if isinstance(obj, dict):
-            return obj
-        raise LLMError("Model output JSON was not an object")
-    except Exception as e:
-        # Many local models output "Python dicts" with single quotes.
-        try:
-            obj2 = literal_eval(candidate)
-            if isinstance(obj2, dict):
-                return {str(k): v for k, v in obj2.items()}
-        except Exception:
-            pass
+        obj2 = literal_eval(t2[start : end + 1])
+        if isinstance(obj2, dict):
+            return {str(k): v for k, v in obj2.items()}
+    except Exception:
+        pass
 
-        # Final attempt: regex extraction from the (cleaned) text.
-        return _extract_object_by_regex(t2)
+    # Final attempt: regex extraction from the (cleaned) text.
+    return _extract_object_by_regex(t2)
 
 
 def _extract_object_by_regex(text: str) -> dict[str, Any]:
@@ -136,17 +217,17 @@ def _extract_object_by_regex(text: str) -> dict[str, Any]:
     """
     out: dict[str, Any] = {}
     # Category
-    m = re.search(r"category\s*[:=]\s*['\"]([^'\"]+)['\"]", text, flags=re.IGNORECASE)
+    m = _CAT_RE.search(text)
     if m:
         out["category"] = m.group(1).strip()
 
     # Confidence
-    m = re.search(r"confidence\s*[:=]\s*([0-9]*\.?[0-9]+)", text, flags=re.IGNORECASE)
+    m = _CONF_RE.search(text)
     if m:
         out["confidence"] = m.group(1)
 
     # Reason
-    m = re.search(r"reason\s*[:=]\s*['\"]([^'\"]+)['\"]", text, flags=re.IGNORECASE)
+    m = _REASON_RE.search(text)
     if m:
         out["reason"] = m.group(1).strip()
 
@@ -156,11 +237,18 @@ def _extract_object_by_regex(text: str) -> dict[str, Any]:
 def _normalize_category_name(name: str) -> str:
     # Lower + remove punctuation-ish to tolerate minor formatting differences.
     s = name.lower().strip()
-    s = re.sub(r"[^a-z0-9]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _NORM_PUNCT_RE.sub(" ", s)
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 
+try:
+    # Resolved once; "<home>/" so the prefix check can't match e.g. /Users/bobby for /Users/bob.
+    _HOME_PREFIX: str | None = str(Path.home()) + os.sep
+except RuntimeError:  # pragma: no cover - no resolvable home directory
+    _HOME_PREFIX = None
+
+
 def _format_source_path(path_str: str | None, *, mode: PathMode, tail_parts: int) -> str | None:
     if not path_str:
         return None
@@ -170,14 +258,10 @@ def _format_source_path(path_str: str | None, *, mode: PathMode, tail_parts: int
 
     if mode == "full":
         # Replace home with "~" (avoids leaking username).
-        try:
-            home = str(Path.home())
-            s = str(p)
-            if s.startswith(home + os.sep):
-                return "~" + s[len(home) :]
-            return s
-        except Exception:
-            return str(p)
+        s = str(p)
+        if _HOME_PREFIX and s.startswith(_HOME_PREFIX):
+            return "~" + s[len(_HOME_PREFIX) - 1 :]
+        return s
 
     # mode == "tail"
     parts = p.parts
@@ -186,6 +270,11 @@ def _format_source_path(path_str: str | None, *, mode: PathMode, tail_parts: int
     return "…/" + "/".join(tail)
 
 
+# Bump whenever build_categorization_prompt or response parsing changes meaning: it is part of the
+# LLM cache key (see catalog._llm_cache_key), so cached answers from older prompts stop matching.
+PROMPT_VERSION = 1
+
+
 def build_categorization_prompt(
     *,
     categories: list[str],
@@ -226,24 +315,18 @@ def build_categorization_prompt(
         lines.append(f"- pages: {page_count}")
     if text_sample:
         # Keep the prompt stable: strip excessive whitespace.
-        sample = re.sub(r"\s+", " ", text_sample).strip()
+        sample = _WS_RE.sub(" ", text_sample).strip()
         lines.append(f"- text_sample: {sample}")
     return "\n".join(lines).strip() + "\n"
 
 
-def classify_with_uzu(
+def _uzu_request(
     *,
     base_url: str,
     model: str | None,
     prompt: str,
-    timeout_seconds: float,
     max_output_tokens: int,
-) -> str:
-    """
-    UZU local server (OpenAI-compatible). See your local UZU docs (AGENT_GUIDE.md).
-
-    Endpoint: POST {base_url}/chat/completions
-    """
+) -> tuple[str, dict[str, str], dict[str, Any]]:
     base = (base_url or "").strip().rstrip("/")
     if not base:
         raise LLMError("Missing UZU_BASE_URL (e.g. http://localhost:8000)")
@@ -259,9 +342,10 @@ def classify_with_uzu(
     }
     if model:
         payload["model"] = model
+    return url, headers, payload
 
-    resp = _http_post_json(url=url, headers=headers, payload=payload, timeout_seconds=timeout_seconds)
 
+def _uzu_response_text(resp: dict[str, Any]) -> str:
     # OpenAI chat.completions-like
     choices = resp.get("choices")
     if isinstance(choices, list) and choices:
@@ -282,10 +366,50 @@ def classify_with_uzu(
     raise LLMError(f"Unexpected UZU response shape: keys={sorted(resp.keys())}")
 
 
-def llm_classify_category(
+def classify_with_uzu(
+    *,
+    base_url: str,
+    model: str | None,
+    prompt: str,
+    timeout_seconds: float,
+    max_output_tokens: int,
+) -> str:
+    """
+    UZU local server (OpenAI-compatible). See your local UZU docs (AGENT_GUIDE.md).
+
+    Endpoint: POST {base_url}/chat/completions
+    """
+    url, headers, payload = _uzu_request(
+        base_url=base_url, model=model, prompt=prompt, max_output_tokens=max_output_tokens
+    )
+    resp = _http_post_json(url=url, headers=headers, payload=payload, timeout_seconds=timeout_seconds)
+    return _uzu_response_text(resp)
+
+
+async def aclassify_with_uzu(
+    *,
+    base_url: str,
+    model: str | None,
+    prompt: str,
+    timeout_seconds: float,
+    max_output_tokens: int,
+) -> str:
+    """
+    Async `classify_with_uzu`: the blocking POST runs on a worker thread so many
+    requests can be in flight at once.
+    """
+    url, headers, payload = _uzu_request(
+        base_url=base_url, model=model, prompt=prompt, max_output_tokens=max_output_tokens
+    )
+    resp = await asyncio.to_thread(
+        _http_post_json, url=url, headers=headers, payload=payload, timeout_seconds=timeout_seconds
+    )
+    return _uzu_response_text(resp)
+
+
+def _prepare_classification(
     *,
     provider: ProviderName,
-    model: str,
     categories: list[str],
     default_category: str,
     source_path: str | None,
@@ -296,11 +420,12 @@ def llm_classify_category(
     keywords: str | None,
     page_count: int | None,
     text_sample: str | None,
-    timeout_seconds: float = 30.0,
-    max_output_tokens: int = 200,
-    path_mode: PathMode = "tail",
-    path_tail_parts: int = 3,
-) -> LLMClassification:
+    path_mode: PathMode,
+    path_tail_parts: int,
+) -> tuple[str, dict[str, str]]:
+    """
+    Returns (prompt, normalized category name -> allowed category).
+    """
     if provider != "uzu":
         raise LLMError("Only the local UZU provider is supported.")
 
@@ -320,17 +445,20 @@ def llm_classify_category(
         page_count=page_count,
         text_sample=text_sample,
     )
+    return prompt, normalized
 
-    started = time.time()
-    base_url = os.environ.get("UZU_BASE_URL", "http://localhost:8000").strip()
-    raw_text = classify_with_uzu(
-        base_url=base_url,
-        model=model if model else None,
-        prompt=prompt,
-        timeout_seconds=timeout_seconds,
-        max_output_tokens=max_output_tokens,
-    )
 
+def _uzu_base_url() -> str:
+    return os.environ.get("UZU_BASE_URL", "http://localhost:8000").strip()
+
+
+def _parse_classification(
+    raw_text: str,
+    *,
+    default_category: str,
+    normalized: dict[str, str],
+    elapsed: float,
+) -> LLMClassification:
     parsed = _extract_json_object(raw_text)
     cat_raw = parsed.get("category")
     conf_raw = parsed.get("confidence")
@@ -358,9 +486,137 @@ def llm_classify_category(
     if len(reason) > 200:
         reason = reason[:200].rstrip()
 
-    elapsed = time.time() - started
     reason = reason or f"llm classified in {elapsed:.2f}s"
 
     return LLMClassification(category=cat, confidence=conf, reason=reason, raw_text=raw_text)
 
 
+def llm_classify_category(
+    *,
+    provider: ProviderName,
+    model: str,
+    categories: list[str],
+    default_category: str,
+    source_path: str | None,
+    source_basename: str | None,
+    title: str | None,
+    authors: str | None,
+    subject: str | None,
+    keywords: str | None,
+    page_count: int | None,
+    text_sample: str | None,
+    timeout_seconds: float = 30.0,
+    max_output_tokens: int = 200,
+    path_mode: PathMode = "tail",
+    path_tail_parts: int = 3,
+) -> LLMClassification:
+    prompt, normalized = _prepare_classification(
+        provider=provider,
+        categories=categories,
+        default_category=default_category,
+        source_path=source_path,
+        source_basename=source_basename,
+        title=title,
+        authors=authors,
+        subject=subject,
+        keywords=keywords,
+        page_count=page_count,
+        text_sample=text_sample,
+        path_mode=path_mode,
+        path_tail_parts=path_tail_parts,
+    )
+
+    started = time.time()
+    raw_text = classify_with_uzu(
+        base_url=_uzu_base_url(),
+        model=model if model else None,
+        prompt=prompt,
+        timeout_seconds=timeout_seconds,
+        max_output_tokens=max_output_tokens,
+    )
+    return _parse_classification(
+        raw_text,
+        default_category=default_category,
+        normalized=normalized,
+        elapsed=time.time() - started,
+    )
+
+
+async def allm_classify_category(
+    *,
+    provider: ProviderName,
+    model: str,
+    categories: list[str],
+    default_category: str,
+    source_path: str | None,
+    source_basename: str | None,
+    title: str | None,
+    authors: str | None,
+    subject: str | None,
+    keywords: str | None,
+    page_count: int | None,
+    text_sample: str | None,
+    timeout_seconds: float = 30.0,
+    max_output_tokens: int = 200,
+    path_mode: PathMode = "tail",
+    path_tail_parts: int = 3,
+) -> LLMClassification:
+    """
+    Async `llm_classify_category` (same arguments and result).
+    """
+    prompt, normalized = _prepare_classification(
+        provider=provider,
+        categories=categories,
+        default_category=default_category,
+        source_path=source_path,
+        source_basename=source_basename,
+        title=title,
+        authors=authors,
+        subject=subject,
+        keywords=keywords,
+        page_count=page_count,
+        text_sample=text_sample,
+        path_mode=path_mode,
+        path_tail_parts=path_tail_parts,
+    )
+
+    started = time.time()
+    raw_text = await aclassify_with_uzu(
+        base_url=_uzu_base_url(),
+        model=model if model else None,
+        prompt=prompt,
+        timeout_seconds=timeout_seconds,
+        max_output_tokens=max_output_tokens,
+    )
+    return _parse_classification(
+        raw_text,
+        default_category=default_category,
+        normalized=normalized,
+        elapsed=time.time() - started,
+    )
+
+
+async def llm_classify_category_many(
+    docs: Iterable[dict[str, Any]],
+    *,
+    concurrency: int = 8,
+    **common: Any,
+) -> list[LLMClassification | LLMError]:
+    """
+    Classify many documents with at most `concurrency` requests in flight.
+
+    Each doc dict holds the per-document arguments of `llm_classify_category`
+    (source_path, title, text_sample, ...); `common` holds the shared ones
+    (provider, model, categories, ...). Results are returned in input order; a
+    failed request yields its LLMError instead of aborting the batch.
+    """
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def one(doc: dict[str, Any]) -> LLMClassification | LLMError:
+        async with sem:
+            try:
+                return await allm_classify_category(**common, **doc)
+            except LLMError as e:
+                return e
+
+    return list(await asyncio.gather(*[one(d) for d in docs]))
@@ -11,6 +11,19 @@ from .util import read_text_limited
 
 _MDLS = "/usr/bin/mdls"
 
+# Paths per bulk mdls invocation.
+_MDLS_BULK_CHUNK = 200
+
+_BASIC_NAMES = (
+    "kMDItemTitle",
+    "kMDItemAuthors",
+    "kMDItemSubject",
+    "kMDItemKeywords",
+    "kMDItemNumberOfPages",
+    "kMDItemContentType",
+    "kMDItemContentTypeTree",
+)
+
 
 def _clean_mdls_value(val: Any) -> Any:
     # mdls sometimes returns "(null)" as a string sentinel.
@@ -21,38 +34,88 @@ def _clean_mdls_value(val: Any) -> Any:
     return val
 
 
+def _mdls_basic_cmd(paths: list[Path]) -> list[str]:
+    cmd = [_MDLS, "-plist"]
+    for name in _BASIC_NAMES:
+        cmd += ["-name", name]
+    cmd += [str(p) for p in paths]
+    return cmd
+
+
+def _clean_plist(plist: dict[str, Any]) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for k, v in plist.items():
+        out[k] = _clean_mdls_value(v)
+    return out
+
+
+def _split_plists(data: bytes) -> list[dict[str, Any]] | None:
+    """
+    Parse multi-file `mdls -plist` output: either one plist array (one dict per file)
+    or one plist document per file, back to back. None if neither shape fits.
+    """
+    try:
+        obj = plistlib.loads(data)
+    except Exception:
+        obj = None
+    if isinstance(obj, dict):
+        return [obj]
+    if isinstance(obj, list):
+        return obj if all(isinstance(x, dict) for x in obj) else None
+
+    out: list[dict[str, Any]] = []
+    for part in data.split(b"<?xml"):
+        if not part.strip():
+            continue
+        try:
+            doc = plistlib.loads(b"<?xml" + part)
+        except Exception:
+            return None
+        if not isinstance(doc, dict):
+            return None
+        out.append(doc)
+    return out
+
+
 def mdls_basic(path: Path) -> dict[str, Any]:
     """
     Fetch small-ish metadata via `mdls -plist` (fast, structured).
     """
-    names = [
-        "kMDItemTitle",
-        "kMDItemAuthors",
-        "kMDItemSubject",
-        "kMDItemKeywords",
-        "kMDItemNumberOfPages",
-        "kMDItemContentType",
-        "kMDItemContentTypeTree",
-    ]
-    cmd = [_MDLS, "-plist"]
-    for name in names:
-        cmd += ["-name", name]
-    cmd.append(str(path))
-
-    res = subprocess.run(cmd, capture_output=True)
+    res = subprocess.run(_mdls_basic_cmd([path]), capture_output=True)
     if res.returncode != 0 or not res.stdout:
         return {}
     try:
         plist = plistlib.loads(res.stdout)
     except Exception:
         return {}
+    return _clean_plist(plist)
 
-    out: dict[str, Any] = {}
-    for k, v in plist.items():
-        out[k] = _clean_mdls_value(v)
+
+def mdls_basic_bulk(paths: list[Path], *, chunk_size: int = _MDLS_BULK_CHUNK) -> dict[Path, dict[str, Any]]:
+    """
+    Like `mdls_basic`, but one `mdls` process per `chunk_size` files (amortizes fork/exec
+    while keeping argv well under ARG_MAX).
+    """
+    out: dict[Path, dict[str, Any]] = {}
+    for i in range(0, len(paths), chunk_size):
+        out.update(_mdls_basic_chunk(paths[i : i + chunk_size]))
     return out
 
 
+def _mdls_basic_chunk(paths: list[Path]) -> dict[Path, dict[str, Any]]:
+    """
+    Falls back to per-file calls if the combined output can't be matched to the inputs
+    (e.g. one of the files is missing and mdls exits non-zero).
+    """
+    if not paths:
+        return {}
+    res = subprocess.run(_mdls_basic_cmd(paths), capture_output=True)
+    plists = _split_plists(res.stdout) if res.returncode == 0 and res.stdout else None
+    if plists is None or len(plists) != len(paths):
+        return {p: mdls_basic(p) for p in paths}
+    return {p: _clean_plist(pl) for p, pl in zip(paths, plists)}
+
+
 def mdls_text_sample(path: Path, *, max_bytes: int = 8192) -> str | None:
     """
     Get a limited text sample from Spotlight's extracted text.
@@ -10,7 +10,7 @@ from .util import ensure_dir, safe_filename
 
 def _relative_symlink(target: Path, link_path: Path) -> None:
     ensure_dir(link_path.parent)
-    if link_path.exists() or link_path.is_symlink():
+    if os.path.lexists(link_path):
         link_path.unlink(missing_ok=True)
     rel_target = os.path.relpath(str(target), start=str(link_path.parent))
     link_path.symlink_to(rel_target)
@@ -18,14 +18,14 @@ def _relative_symlink(target: Path, link_path: Path) -> None:
 
 def _hardlink(target: Path, link_path: Path) -> None:
     ensure_dir(link_path.parent)
-    if link_path.exists() or link_path.is_symlink():
+    if os.path.lexists(link_path):
         link_path.unlink(missing_ok=True)
     os.link(target, link_path)
 
 
 def _copy(target: Path, link_path: Path) -> None:
     ensure_dir(link_path.parent)
-    if link_path.exists() or link_path.is_symlink():
+    if os.path.lexists(link_path):
         link_path.unlink(missing_ok=True)
     shutil.copy2(target, link_path)
 
@@ -65,6 +65,9 @@ def build_categorized_view(
 
     created = 0
     by_category: dict[str, int] = {}
+    # Entry names per category dir (lower-cased: macOS volumes are usually case-insensitive),
+    # listed once so collision probing is an in-memory lookup rather than a stat per candidate.
+    names_by_dir: dict[Path, set[str]] = {}
 
     for doc in documents:
         hash_hex = doc["hash"]
@@ -72,7 +75,10 @@ def build_categorized_view(
         category = (doc.get("category") or default_category).strip() or default_category
 
         cat_dir = categorized / safe_filename(category)
-        ensure_dir(cat_dir)
+        taken = names_by_dir.get(cat_dir)
+        if taken is None:
+            ensure_dir(cat_dir)
+            taken = names_by_dir[cat_dir] = {name.lower() for name in os.listdir(cat_dir)}
 
         base_name = safe_filename(name_resolver(hash_hex))
         if not base_name.lower().endswith(".pdf"):
@@ -80,11 +86,13 @@ def build_categorized_view(
 
         # Avoid collisions deterministically.
         stem = base_name[:-4] if base_name.lower().endswith(".pdf") else base_name
-        candidate = cat_dir / f"{stem}__{hash_hex[:8]}.pdf"
+        name = f"{stem}__{hash_hex[:8]}.pdf"
         n = 2
-        while candidate.exists() or candidate.is_symlink():
-            candidate = cat_dir / f"{stem}__{hash_hex[:8]}__{n}.pdf"
+        while name.lower() in taken:
+            name = f"{stem}__{hash_hex[:8]}__{n}.pdf"
             n += 1
+        taken.add(name.lower())
+        candidate = cat_dir / name
 
         vault_path = library.root / vault_relpath
         try:
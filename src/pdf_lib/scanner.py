@@ -3,11 +3,20 @@ from __future__ import annotations
 import os
 import shutil
 import subprocess
+import threading
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from . import db as db_mod
 from .library import Library
-from .util import CopyResult, copy_to_temp_and_hash, ensure_dir, is_under, now_ts, resolve_path
+from .util import CopyResult, copy_to_temp_and_hash, ensure_dir, is_under_fast, now_ts, resolve_path
+
+# Copy+hash is IO bound and hashlib releases the GIL, so a few more threads than cores pays off.
+_COPY_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+# Serializes the vault exists/replace step so identical files copied in parallel still dedupe.
+_vault_lock = threading.Lock()
+# Commit the scan transaction every N discovered files so an interrupted scan keeps its progress.
+_COMMIT_EVERY = 500
 
 
 def default_scan_roots() -> list[Path]:
@@ -57,9 +66,16 @@ def default_excludes() -> list[Path]:
     ]
 
 
-def _is_excluded(path: Path, exclude_prefixes: list[Path]) -> bool:
-    for ex in exclude_prefixes:
-        if is_under(path, ex):
+def _resolve_excludes(exclude_prefixes: list[Path]) -> tuple[str, ...]:
+    """
+    Resolve exclude prefixes once per scan so per-file checks are pure string compares.
+    """
+    return tuple(str(resolve_path(ex)) for ex in exclude_prefixes)
+
+
+def _is_excluded(path_str: str, excludes: tuple[str, ...]) -> bool:
+    for ex in excludes:
+        if is_under_fast(path_str, ex):
             return True
     return False
 
@@ -73,30 +89,42 @@ def find_pdfs_mdfind(roots: list[Path], *, exclude_prefixes: list[Path], limit:
         '|| kMDItemFSName == "*.pdf")'
     )
 
+    if not roots:
+        return
+
+    # One Spotlight query covering every root (mdfind accepts repeated -onlyin).
+    cmd = ["/usr/bin/mdfind"]
+    for root in roots:
+        cmd += ["-onlyin", str(resolve_path(root))]
+    cmd.append(query)
+
+    excludes = _resolve_excludes(exclude_prefixes)
     yielded = 0
     seen: set[str] = set()
-    for root in roots:
-        root = resolve_path(root)
-        cmd = ["/usr/bin/mdfind", "-onlyin", str(root), query]
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
-        assert proc.stdout is not None
-        for line in proc.stdout:
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    assert proc.stdout is not None
+    # Without a limit there is no early exit, so read the whole result in one go.
+    lines = proc.stdout if limit is not None else proc.communicate()[0].splitlines()
+    try:
+        for line in lines:
             p = line.strip()
             if not p:
                 continue
             if p in seen:
                 continue
             seen.add(p)
-            path = Path(p)
-            if _is_excluded(path, exclude_prefixes):
+            if _is_excluded(p, excludes):
                 continue
+            path = Path(p)
             if not path.exists() or not path.is_file():
                 continue
             yield path
             yielded += 1
             if limit is not None and yielded >= limit:
-                proc.terminate()
                 return
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
         proc.wait()
 
 
@@ -104,6 +132,7 @@ def find_pdfs_walk(roots: list[Path], *, exclude_prefixes: list[Path], limit: in
     """
     Slower fallback: walk the filesystem and pick *.pdf (case-insensitive).
     """
+    excludes = _resolve_excludes(exclude_prefixes)
     yielded = 0
     seen: set[str] = set()
     for root in roots:
@@ -111,37 +140,66 @@ def find_pdfs_walk(roots: list[Path], *, exclude_prefixes: list[Path], limit: in
         if not root.exists():
             continue
 
-        for dirpath, dirnames, filenames in os.walk(root):
-            dir_path = Path(dirpath)
+        for path_str in _scandir_pdfs(str(root), excludes):
+            if path_str in seen:
+                continue
+            seen.add(path_str)
+            yield Path(path_str)
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
 
-            # Prune excluded dirs in-place for speed.
-            pruned: list[str] = []
-            for d in list(dirnames):
-                dp = dir_path / d
-                if _is_excluded(dp, exclude_prefixes):
-                    pruned.append(d)
-            for d in pruned:
-                dirnames.remove(d)
 
-            for fn in filenames:
-                if not fn.lower().endswith(".pdf"):
-                    continue
-                full = dir_path / fn
-                key = str(full)
-                if key in seen:
+def _scandir_pdfs(root: str, excludes: tuple[str, ...]):
+    """
+    Top-down walk like os.walk (symlinked dirs are not followed), yielding PDF paths as strings.
+    DirEntry type checks reuse the dirent type, so most files are never stat'ed.
+    """
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        subdirs: list[str] = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    # Prune excluded dirs before descending.
+                    if not _is_excluded(entry.path, excludes):
+                        subdirs.append(entry.path)
                     continue
-                seen.add(key)
-                if _is_excluded(full, exclude_prefixes):
+                if not entry.name.lower().endswith(".pdf"):
                     continue
-                try:
-                    if not full.is_file():
-                        continue
-                except OSError:
+                if _is_excluded(entry.path, excludes) or not entry.is_file():
                     continue
-                yield full
-                yielded += 1
-                if limit is not None and yielded >= limit:
-                    return
+            except OSError:
+                continue
+            yield entry.path
+        # Reversed so subdirectories are visited in listing order.
+        stack.extend(reversed(subdirs))
+
+
+def _sync_filesystems() -> None:
+    """
+    Vault copies skip per-file fsync; flush them once before the manifest commits refer to them.
+    """
+    if hasattr(os, "sync"):
+        os.sync()
+
+
+def _vault_file_intact(vault_path: Path, expected_size: int) -> bool:
+    """
+    Vault files are only synced in batches, so a crash can leave one short; trust it only if
+    its size matches.
+    """
+    try:
+        return vault_path.stat().st_size == expected_size
+    except OSError:
+        return False
 
 
 def _copy_into_vault(library: Library, src: Path) -> tuple[str, Path, int, bool]:
@@ -152,12 +210,14 @@ def _copy_into_vault(library: Library, src: Path) -> tuple[str, Path, int, bool]
     result: CopyResult = copy_to_temp_and_hash(src, library.tmp_dir)
     vault_path = library.vault_path_for_hash(result.sha256_hex)
 
-    if vault_path.exists():
-        result.tmp_path.unlink(missing_ok=True)
-        return result.sha256_hex, vault_path, result.bytes_written, False
+    with _vault_lock:
+        if _vault_file_intact(vault_path, result.bytes_written):
+            result.tmp_path.unlink(missing_ok=True)
+            return result.sha256_hex, vault_path, result.bytes_written, False
 
-    vault_path.parent.mkdir(parents=True, exist_ok=True)
-    result.tmp_path.replace(vault_path)
+        # Missing, or truncated by a crash before the batch sync: (re)place it from this copy.
+        vault_path.parent.mkdir(parents=True, exist_ok=True)
+        result.tmp_path.replace(vault_path)
     try:
         shutil.copystat(src, vault_path, follow_symlinks=True)
     except OSError:
@@ -194,6 +254,7 @@ def scan_and_copy(
             "skipped_unchanged": 0,
             "copied_new": 0,
             "deduped_existing": 0,
+            "reused_known_hash": 0,
             "errors": 0,
         }
         for src in finder(roots, exclude_prefixes=exclude_prefixes, limit=limit):
@@ -213,78 +274,29 @@ def scan_and_copy(
             "skipped_unchanged": 0,
             "copied_new": 0,
             "deduped_existing": 0,
+            "reused_known_hash": 0,
             "errors": 0,
         }
 
-        for src in finder(roots, exclude_prefixes=exclude_prefixes, limit=limit):
-            stats["discovered"] += 1
-            src_str = str(src)
-            base = src.name
-
-            try:
-                st = src.stat()
-            except (OSError, PermissionError) as e:
-                stats["errors"] += 1
-                db_mod.upsert_source(
-                    conn,
-                    source_path=src_str,
-                    source_basename=base,
-                    source_size=None,
-                    source_mtime=None,
-                    hash_hex=None,
-                    status="unreadable",
-                    error=str(e),
-                    first_seen_at=now,
-                    last_seen_at=now,
-                )
-                continue
-
-            rec = db_mod.get_source(conn, src_str)
-            if rec and rec.get("status") == "ok":
-                if rec.get("source_size") == st.st_size and rec.get("source_mtime") == st.st_mtime:
-                    stats["skipped_unchanged"] += 1
-                    db_mod.touch_source_seen(conn, src_str, seen_at=now)
-                    continue
-
-            if dry_run:
-                if verbose:
-                    print(f"[dry-run] would copy: {src}")
-                continue
-
-            try:
-                hash_hex, vault_path, bytes_written, was_copied = _copy_into_vault(library, src)
-            except (OSError, PermissionError) as e:
-                stats["errors"] += 1
-                db_mod.upsert_source(
-                    conn,
-                    source_path=src_str,
-                    source_basename=base,
-                    source_size=st.st_size,
-                    source_mtime=st.st_mtime,
-                    hash_hex=None,
-                    status="error",
-                    error=str(e),
-                    first_seen_at=now,
-                    last_seen_at=now,
-                )
-                continue
-
+        def record_ok(src: Path, st: os.stat_result, hash_hex: str, vault_path: Path, file_size: int) -> None:
             vault_relpath = str(vault_path.relative_to(library.root))
             db_mod.upsert_document_seen(
                 conn,
                 hash_hex=hash_hex,
                 vault_relpath=vault_relpath,
-                file_size=bytes_written,
+                file_size=file_size,
                 first_seen_at=now,
                 last_seen_at=now,
             )
 
             db_mod.upsert_source(
                 conn,
-                source_path=src_str,
-                source_basename=base,
+                source_path=str(src),
+                source_basename=src.name,
                 source_size=st.st_size,
                 source_mtime=st.st_mtime,
+                source_dev=st.st_dev,
+                source_ino=st.st_ino,
                 hash_hex=hash_hex,
                 status="ok",
                 error=None,
@@ -292,12 +304,100 @@ def scan_and_copy(
                 last_seen_at=now,
             )
 
+        def record_copy(src: Path, st: os.stat_result, fut: Future) -> None:
+            src_str = str(src)
+            try:
+                hash_hex, vault_path, bytes_written, was_copied = fut.result()
+            except (OSError, PermissionError) as e:
+                stats["errors"] += 1
+                db_mod.upsert_source(
+                    conn,
+                    source_path=src_str,
+                    source_basename=src.name,
+                    source_size=st.st_size,
+                    source_mtime=st.st_mtime,
+                    hash_hex=None,
+                    status="error",
+                    error=str(e),
+                    first_seen_at=now,
+                    last_seen_at=now,
+                )
+                return
+
+            record_ok(src, st, hash_hex, vault_path, bytes_written)
             if was_copied:
                 stats["copied_new"] += 1
             else:
                 stats["deduped_existing"] += 1
 
-        conn.commit()
+        # Copy+hash runs on worker threads; every DB access stays on this thread.
+        pending: dict[Future, tuple[Path, os.stat_result]] = {}
+
+        def drain(return_when: str) -> None:
+            done, _ = wait(pending, return_when=return_when)
+            for fut in done:
+                src, st = pending.pop(fut)
+                record_copy(src, st, fut)
+
+        with db_mod.transaction(conn), ThreadPoolExecutor(max_workers=_COPY_WORKERS) as pool:
+            for src in finder(roots, exclude_prefixes=exclude_prefixes, limit=limit):
+                stats["discovered"] += 1
+                if stats["discovered"] % _COMMIT_EVERY == 0:
+                    _sync_filesystems()
+                    db_mod.checkpoint(conn)
+                src_str = str(src)
+
+                try:
+                    st = src.stat()
+                except (OSError, PermissionError) as e:
+                    stats["errors"] += 1
+                    db_mod.upsert_source(
+                        conn,
+                        source_path=src_str,
+                        source_basename=src.name,
+                        source_size=None,
+                        source_mtime=None,
+                        hash_hex=None,
+                        status="unreadable",
+                        error=str(e),
+                        first_seen_at=now,
+                        last_seen_at=now,
+                    )
+                    continue
+
+                rec = db_mod.get_source(conn, src_str)
+                if rec and rec.get("status") == "ok":
+                    if rec.get("source_size") == st.st_size and rec.get("source_mtime") == st.st_mtime:
+                        stats["skipped_unchanged"] += 1
+                        db_mod.touch_source_seen(
+                            conn, src_str, seen_at=now, source_dev=st.st_dev, source_ino=st.st_ino
+                        )
+                        continue
+
+                # Same file under another path (moved, renamed or hard-linked): reuse its hash
+                # instead of reading and hashing it again.
+                known_hash = db_mod.find_hash_by_file_identity(
+                    conn,
+                    source_size=st.st_size,
+                    source_mtime=st.st_mtime,
+                    source_dev=st.st_dev,
+                    source_ino=st.st_ino,
+                )
+                if known_hash is not None:
+                    vault_path = library.vault_path_for_hash(known_hash)
+                    if _vault_file_intact(vault_path, st.st_size):
+                        record_ok(src, st, known_hash, vault_path, st.st_size)
+                        stats["reused_known_hash"] += 1
+                        continue
+
+                pending[pool.submit(_copy_into_vault, library, src)] = (src, st)
+                # Bound the in-flight work so huge scans don't queue every path up front.
+                if len(pending) >= _COPY_WORKERS * 2:
+                    drain(FIRST_COMPLETED)
+
+            drain(ALL_COMPLETED)
+            _sync_filesystems()
+
         return stats
     finally:
         conn.close()
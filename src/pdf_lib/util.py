@@ -8,7 +8,12 @@ import uuid
 from dataclasses import dataclass
 from hashlib import sha256
 from pathlib import Path
-from typing import Iterable
+from typing import BinaryIO, Iterable
+
+try:
+    from hashlib import file_digest
+except ImportError:  # pragma: no cover - Python < 3.11
+    file_digest = None
 
 
 def now_ts() -> float:
@@ -34,6 +39,13 @@ def is_under(path: Path, prefix: Path) -> bool:
     return path_r == prefix_r or path_r.is_relative_to(prefix_r)
 
 
+def is_under_fast(path_str: str, prefix_str: str) -> bool:
+    """
+    String-only is_under for hot loops: both sides must already be resolved (no syscalls).
+    """
+    return path_str == prefix_str or path_str.startswith(prefix_str.rstrip(os.sep) + os.sep)
+
+
 def dedupe_keep_order(items: Iterable[Path]) -> list[Path]:
     out: list[Path] = []
     seen: set[str] = set()
@@ -47,12 +59,16 @@ def dedupe_keep_order(items: Iterable[Path]) -> list[Path]:
 
 
 _SAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._ -]+")
+# After _SAFE_FILENAME_RE the only whitespace left is " ", so collapsing runs of it is enough.
+_SPACE_RUN_RE = re.compile(" {2,}")
 
 
 def safe_filename(name: str, *, max_len: int = 160) -> str:
     name = name.strip().replace("\u0000", "")
     name = _SAFE_FILENAME_RE.sub("_", name)
-    name = re.sub(r"\s+", " ", name).strip()
+    if "  " in name:
+        name = _SPACE_RUN_RE.sub(" ", name)
+    name = name.strip()
     if not name:
         name = "untitled"
     if len(name) > max_len:
@@ -81,26 +97,59 @@ class CopyResult:
     tmp_path: Path
 
 
-def copy_to_temp_and_hash(src: Path, tmp_dir: Path, *, chunk_size: int = 1024 * 1024) -> CopyResult:
+def _copy_file_data(rf: BinaryIO, wf: BinaryIO, *, chunk_size: int) -> int:
+    """
+    Copy rf into wf (both freshly opened), kernel-side via sendfile where supported.
+    Returns the number of bytes copied.
+    """
+    in_fd, out_fd = rf.fileno(), wf.fileno()
+    offset = 0
+    if hasattr(os, "sendfile"):
+        try:
+            while True:
+                sent = os.sendfile(out_fd, in_fd, offset, chunk_size)
+                if sent == 0:
+                    return offset
+                offset += sent
+        except OSError:
+            # e.g. macOS only sends to sockets; fall back unless we already wrote data.
+            if offset:
+                raise
+    shutil.copyfileobj(rf, wf, chunk_size)
+    wf.flush()
+    return wf.tell()
+
+
+def _sha256_file(fp: BinaryIO, *, chunk_size: int) -> str:
+    if file_digest is not None:
+        return file_digest(fp, "sha256").hexdigest()
+    h = sha256()
+    for chunk in iter(lambda: fp.read(chunk_size), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def copy_to_temp_and_hash(
+    src: Path, tmp_dir: Path, *, chunk_size: int = 1024 * 1024, fsync: bool = False
+) -> CopyResult:
+    """
+    Copy src into a fresh temp file under tmp_dir and hash the copy.
+    fsync=True flushes the temp file to disk before returning; batch callers leave it off and
+    sync once per batch instead (see scanner.scan_and_copy).
+    """
     ensure_dir(tmp_dir)
     tmp_path = tmp_dir / f"{uuid.uuid4().hex}.tmp"
 
-    h = sha256()
-    bytes_written = 0
-
-    with src.open("rb") as rf, tmp_path.open("wb") as wf:
-        while True:
-            chunk = rf.read(chunk_size)
-            if not chunk:
-                break
-            wf.write(chunk)
-            h.update(chunk)
-            bytes_written += len(chunk)
+    with src.open("rb") as rf, tmp_path.open("w+b") as wf:
+        bytes_written = _copy_file_data(rf, wf, chunk_size=chunk_size)
+        if fsync:
+            os.fsync(wf.fileno())
 
-        wf.flush()
-        os.fsync(wf.fileno())
+        # Hash what actually landed in the temp file (served from the page cache).
+        wf.seek(0)
+        sha256_hex = _sha256_file(wf, chunk_size=chunk_size)
 
-    return CopyResult(sha256_hex=h.hexdigest(), bytes_written=bytes_written, tmp_path=tmp_path)
+    return CopyResult(sha256_hex=sha256_hex, bytes_written=bytes_written, tmp_path=tmp_path)
 
 
 def atomic_move(src: Path, dest: Path) -> None:
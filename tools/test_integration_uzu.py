@@ -1,10 +1,36 @@
-from __future__ import annotations
-
-import json
 import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from pdf_lib.catalog import categorize_library
+from pdf_lib.library import Library
+from pdf_lib.scanner import scan_and_copy
+
+from _uzu_fakes import UZU_BASE_URL, fake_http_post_json_filename_based, install
+
+_REPO = Path(__file__).resolve().parents[1]
+
+# (name, content) of the sample "PDFs"; pre-encoded so writing them skips the text layer.
+SAMPLE_FILES = (
+    ("Invoice_2025.pdf", b"Invoice\nTotal Due: $123.45\n"),
+    ("Widget3000_Manual.pdf", b"User Guide\nInstallation instructions...\n"),
+)
+
+
+def write_fixtures(dest: Path, files) -> None:
+    """
+    Write (name, bytes) fixtures into dest on a small thread pool (file writes release the GIL),
+    so the test can be pointed at thousands of files as a scan-throughput check.
+    """
+    def write_one(item) -> None:
+        name, data = item
+        (dest / name).write_bytes(data)
+
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(files)))) as ex:
+        list(ex.map(write_one, files))
+
 
 def main() -> None:
     """
@@ -13,58 +39,26 @@ def main() -> None:
       - scan -> vault
       - categorize using llm_provider=uzu with a monkeypatched HTTP client
     """
-    repo = Path(__file__).resolve().parents[1]
-    tmp = repo / ".tmp_integration"
+    tmp = _REPO / ".tmp_integration"
     lib_root = tmp / "library_test"
     sample_docs = tmp / "sample_docs"
 
+    # Move any previous run aside and delete it in the background while this run proceeds.
+    cleanup = None
     if tmp.exists():
-        shutil.rmtree(tmp)
+        victim = tmp.with_name(f"{tmp.name}.old.{os.getpid()}")
+        os.replace(tmp, victim)
+        cleanup = threading.Thread(target=shutil.rmtree, args=(victim,), kwargs={"ignore_errors": True})
+        cleanup.start()
     sample_docs.mkdir(parents=True)
 
-    (sample_docs / "Invoice_2025.pdf").write_text("Invoice\nTotal Due: $123.45\n", encoding="utf-8")
-    (sample_docs / "Widget3000_Manual.pdf").write_text(
-        "User Guide\nInstallation instructions...\n", encoding="utf-8"
-    )
-
-    from pdf_lib.library import Library
-    from pdf_lib.scanner import scan_and_copy
-    from pdf_lib.catalog import categorize_library
-    import pdf_lib.llm as llm_mod
+    write_fixtures(sample_docs, SAMPLE_FILES)
 
     # Monkeypatch uzu HTTP call to return deterministic categories based on prompt content.
-    def fake_http_post_json(*, url: str, headers: dict[str, str], payload: dict, timeout_seconds: float):
-        assert url.endswith("/chat/completions"), url
-        messages = payload.get("messages") or []
-        prompt = messages[-1]["content"] if messages else ""
-        p = str(prompt)
-
-        # Avoid matching category names in the prompt; key off the explicit filename field.
-        filename = ""
-        for line in p.splitlines():
-            if line.lower().startswith("- filename:"):
-                filename = line.split(":", 1)[1].strip().lower()
-                break
-
-        if "invoice" in filename or "receipt" in filename:
-            obj = {"category": "Receipts & Invoices", "confidence": 0.9, "reason": "invoice keyword"}
-        elif "manual" in filename or "guide" in filename:
-            obj = {"category": "Manuals & Guides", "confidence": 0.85, "reason": "manual keyword"}
-        else:
-            obj = {"category": "Unsorted", "confidence": 0.2, "reason": "no signal"}
-
-        return {
-            "choices": [
-                {
-                    "message": {"role": "assistant", "content": json.dumps(obj)},
-                    "finish_reason": "stop",
-                }
-            ]
-        }
-
-    llm_mod._http_post_json = fake_http_post_json  # type: ignore[attr-defined]
-
-    os.environ["UZU_BASE_URL"] = "http://localhost:8000"
+    install(fake_http_post_json_filename_based)
+
+    if os.environ.get("UZU_BASE_URL") != UZU_BASE_URL:
+        os.environ["UZU_BASE_URL"] = UZU_BASE_URL
     lib = Library(root=lib_root)
 
     scan_stats = scan_and_copy(
@@ -96,15 +90,19 @@ def main() -> None:
         verbose=False,
     )
 
-    assert cat_stats["llm_calls"] == 2, cat_stats
-    assert cat_stats["llm_used"] == 2, cat_stats
-    assert cat_stats["llm_failed"] == 0, cat_stats
-    assert cat_stats.get("cat:Receipts & Invoices", 0) == 1, cat_stats
-    assert cat_stats.get("cat:Manuals & Guides", 0) == 1, cat_stats
+    llm_counts = (cat_stats["llm_calls"], cat_stats["llm_used"], cat_stats["llm_failed"])
+    assert llm_counts == (2, 2, 0), cat_stats
+    cat_counts = (cat_stats.get("cat:Receipts & Invoices", 0), cat_stats.get("cat:Manuals & Guides", 0))
+    assert cat_counts == (1, 1), cat_stats
 
     # Check categorized view exists.
     assert (lib_root / "categorized").exists()
-    assert any((lib_root / "categorized").rglob("*.pdf"))
+    assert any(
+        fn.endswith(".pdf") for _dirpath, _dirnames, files in os.walk(lib_root / "categorized") for fn in files
+    )
+
+    if cleanup is not None:
+        cleanup.join()
 
     print("OK: integration scan -> uzu categorize -> categorized view works (no network).")
 
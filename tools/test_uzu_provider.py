@@ -1,31 +1,15 @@
-from __future__ import annotations
-
 import os
 
 
 def main() -> None:
     # Run from repo root with: PYTHONPATH=src python3 tools/test_uzu_provider.py
     from pdf_lib import llm
+    from _uzu_fakes import UZU_BASE_URL, fake_http_post_json_static, install
 
     # Monkeypatch network call so we don't need a running server.
-    def fake_http_post_json(*, url: str, headers: dict[str, str], payload: dict, timeout_seconds: float):
-        assert url.endswith("/chat/completions"), url
-        assert payload.get("messages"), payload
-        # Return an OpenAI-compatible response with JSON content.
-        return {
-            "choices": [
-                {
-                    "message": {
-                        "role": "assistant",
-                        "content": '{"category":"Receipts & Invoices","confidence":0.85,"reason":"invoice keyword"}',
-                    },
-                    "finish_reason": "stop",
-                }
-            ]
-        }
-
-    llm._http_post_json = fake_http_post_json  # type: ignore[attr-defined]
-    os.environ["UZU_BASE_URL"] = "http://localhost:8000"
+    install(fake_http_post_json_static)
+    if os.environ.get("UZU_BASE_URL") != UZU_BASE_URL:
+        os.environ["UZU_BASE_URL"] = UZU_BASE_URL
 
     res = llm.llm_classify_category(
         provider="uzu",
@@ -46,9 +30,10 @@ def main() -> None:
         path_tail_parts=3,
     )
 
-    assert res.category == "Receipts & Invoices", res
-    assert abs(res.confidence - 0.85) < 1e-9, res
-    assert "invoice" in res.reason.lower(), res
+    cat, conf, reason = res.category, res.confidence, res.reason
+    assert cat == "Receipts & Invoices", res
+    assert abs(conf - 0.85) < 1e-9, res
+    assert "invoice" in reason.lower(), res
 
     print("OK: uzu provider parsing + JSON extraction works.")
 